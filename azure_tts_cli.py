@@ -6,15 +6,32 @@ A command-line interface for Azure Cognitive Services Text-to-Speech.
 Supports generating audio from text input with customizable voice selection.
 """
 
+import io
 import os
+import re
+import html
+import queue
 import sys
+import time
+import shutil
+import zipfile
+import hashlib
+import tempfile
 import argparse
-import azure.cognitiveservices.speech as speechsdk
-from dotenv import load_dotenv
+import threading
+from types import SimpleNamespace
+from itertools import islice
+from collections import OrderedDict, deque, namedtuple
 from pathlib import Path
 
-# Load environment variables from .env file
-load_dotenv()
+# The batch API only pays off once a file has more lines than this
+BATCH_MIN_LINES = 4
+
+# --mode auto switches to worker processes for files with at least this many lines
+PROCESS_MIN_LINES = 32
+
+# Number of recent distinct lines remembered when skipping repeats
+DEDUPE_WINDOW = 4096
 
 
 class AzureTTSError(Exception):
@@ -22,6 +39,41 @@ class AzureTTSError(Exception):
     pass
 
 
+def _sdk():
+    """Import the Azure Speech SDK on first use.
+    
+    The SDK loads a large native library, so paths like --help and
+    --list-voices avoid it entirely.
+    """
+    import azure.cognitiveservices.speech as speechsdk
+    return speechsdk
+
+
+def _liburing():
+    """Import liburing for io_uring file writes, or return None if it is not installed."""
+    try:
+        import liburing
+    except ImportError:
+        return None
+    return liburing
+
+
+def _aiohttp():
+    """Import aiohttp, which is only needed for --mode http."""
+    try:
+        import aiohttp
+    except ImportError:
+        raise AzureTTSError("--mode http requires aiohttp. Install it with: pip install aiohttp")
+    return aiohttp
+
+
+# Handle for a synthesis started with AzureTTS.begin()
+PendingSynthesis = namedtuple(
+    'PendingSynthesis',
+    ['output_file', 'cached', 'target', 'synthesizer', 'future']
+)
+
+
 class AzureTTS:
     """Azure Text-to-Speech handler class."""
     
@@ -35,8 +87,46 @@ class AzureTTS:
         "christopher": "en-US-ChristopherNeural"
     }
     
-    def __init__(self, voice_name=None):
+    # Output formats by file extension: (SDK enum name, REST API format name)
+    OUTPUT_FORMATS = {
+        "wav": ("Riff24Khz16BitMonoPcm", "riff-24khz-16bit-mono-pcm"),
+        "mp3": ("Audio24Khz48KBitRateMonoMp3", "audio-24khz-48kbitrate-mono-mp3"),
+        "opus": ("Ogg48Khz16BitMonoOpus", "ogg-48khz-16bit-mono-opus")
+    }
+    
+    # Filename prefixes already derived from voice arguments
+    _PREFIX_CACHE = {}
+    
+    # Default size cap for the on-disk synthesis cache
+    DEFAULT_CACHE_MAX_MB = 500
+    
+    # Eviction shrinks the cache to this fraction of its cap, so it runs rarely
+    CACHE_EVICT_FRACTION = 0.9
+    
+    # Temp files older than this were left by a run that died mid-write
+    STALE_TEMP_SECONDS = 3600
+    
+    # Batch synthesis REST API settings
+    BATCH_API_VERSION = "2024-04-01"
+    BATCH_POLL_INTERVAL = 5  # seconds
+    BATCH_TIMEOUT = 3600  # seconds
+    
+    # Maximum number of io_uring writes in flight
+    URING_QUEUE_DEPTH = 64
+    
+    # Upper bound on open files held by the write buffer
+    MAX_BUFFERED_FILES = 256
+    
+    # Connection warm-up timeout, in seconds
+    WARMUP_CONNECT_TIMEOUT = 5.0
+    
+    def __init__(self, voice_name=None, use_cache=True, output_format='wav'):
         """Initialize Azure TTS with configuration."""
+        # Load environment variables from .env file, unless the credentials are already set
+        if not (os.environ.get('SPEECH_KEY') and os.environ.get('SPEECH_REGION')):
+            from dotenv import load_dotenv
+            load_dotenv()
+        
         self.speech_key = os.environ.get('SPEECH_KEY')
         self.region = os.environ.get('SPEECH_REGION')
         
@@ -47,89 +137,804 @@ class AzureTTS:
             )
         
         # Set voice name
-        if voice_name and voice_name.lower() in self.POPULAR_VOICES:
-            self.voice_name = self.POPULAR_VOICES[voice_name.lower()]
-        elif voice_name:
-            self.voice_name = voice_name
+        if voice_name:
+            self.voice_name = self.POPULAR_VOICES.get(voice_name.lower(), voice_name)
         else:
             self.voice_name = os.environ.get('VOICE_NAME', 'en-US-AvaNeural')
         
-        # Configure speech service
-        endpoint_url = f"https://{self.region}.api.cognitive.microsoft.com/sts/v1.0/issuetoken"
-        self.speech_config = speechsdk.SpeechConfig(
-            subscription=self.speech_key, 
-            endpoint=endpoint_url
-        )
-        self.speech_config.speech_synthesis_voice_name = self.voice_name
+        # Set output format
+        if output_format not in self.OUTPUT_FORMATS:
+            raise AzureTTSError(
+                f"Unsupported output format: {output_format}. "
+                f"Choose from: {', '.join(self.OUTPUT_FORMATS)}"
+            )
+        self.output_format = output_format
+        
+        # The speech service configuration is built on first use
+        self._speech_config = None
+        
+        # Synthesizers are kept around so their service connections get reused
+        self._idle_synthesizers = []
+        self._synthesizer_lock = threading.Lock()
+        self._speaker_synthesizer = None
+        
+        # Write audio in multiples of the filesystem's preferred block size
+        try:
+            self._write_block_size = os.statvfs('.').f_bsize * 4
+        except (AttributeError, OSError):  # os.statvfs is POSIX only
+            self._write_block_size = io.DEFAULT_BUFFER_SIZE * 4
+        
+        # Submit writes through io_uring when available; set up on the first write
+        self._ring = None
+        self._ring_ready = False
+        self._ring_lock = threading.Lock()
+        self._ring_cqe = None
+        self._ring_writes = {}
+        self._ring_next_id = 0
+        self._ring_error = None
+        
+        # Optionally hold finished audio in memory and write it out in bursts
+        self._write_buffer = deque()
+        self._write_buffer_bytes = 0
+        self._write_buffer_limit = 0
+        self._write_buffer_lock = threading.Lock()
+        
+        # Configure synthesis cache
+        self.cache_dir = None
+        if use_cache:
+            self.cache_dir = Path(os.environ.get('TTS_CACHE_DIR', '~/.cache/azure_tts')).expanduser()
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_max_mb = os.environ.get('TTS_CACHE_MAX_MB', self.DEFAULT_CACHE_MAX_MB)
+        try:
+            self.cache_max_bytes = int(float(cache_max_mb) * 1024 * 1024)
+        except ValueError:
+            raise AzureTTSError(f"Invalid TTS_CACHE_MAX_MB value: {cache_max_mb}")
+        self._cache_bytes = None  # Unknown until the first eviction scan
+        self._cache_lock = threading.Lock()
+        
+        # Set once warm_up() has been called
+        self._warm_started = False
+        self._warm_connection = None
     
-    def synthesize_to_file(self, text, output_file):
-        """Synthesize text to audio file."""
+    @property
+    def _sdk(self):
+        """The Azure Speech SDK module."""
+        return _sdk()
+    
+    @property
+    def speech_config(self):
+        """SDK speech configuration, created on first use.
+        
+        REST-only paths like --batch and --mode http never touch it, so they
+        never load the SDK.
+        """
+        with self._synthesizer_lock:
+            if self._speech_config is None:
+                endpoint_url = f"https://{self.region}.api.cognitive.microsoft.com/sts/v1.0/issuetoken"
+                speech_config = self._sdk.SpeechConfig(
+                    subscription=self.speech_key, 
+                    endpoint=endpoint_url
+                )
+                speech_config.speech_synthesis_voice_name = self.voice_name
+                sdk_format = getattr(
+                    self._sdk.SpeechSynthesisOutputFormat, self.OUTPUT_FORMATS[self.output_format][0]
+                )
+                speech_config.set_speech_synthesis_output_format(sdk_format)
+                self._speech_config = speech_config
+            return self._speech_config
+    
+    def warm_up(self):
+        """Connect a first synthesizer in the background while the caller gets ready.
+        
+        Only worth calling before SDK synthesis. Requests never wait for it;
+        the warm synthesizer joins the idle pool once it has connected.
+        """
+        if not self._warm_started:
+            self._warm_started = True
+            threading.Thread(target=self._warmup, daemon=True).start()
+    
+    def _warmup(self):
+        """Open a synthesizer's service connection ahead of the first request."""
         try:
-            audio_config = speechsdk.audio.AudioOutputConfig(filename=str(output_file))
-            synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=self.speech_config, 
-                audio_config=audio_config
-            )
+            synthesizer = self._sdk.SpeechSynthesizer(speech_config=self.speech_config, audio_config=None)
+            connected = threading.Event()
+            connection = self._sdk.Connection.from_speech_synthesizer(synthesizer)
+            connection.connected.connect(lambda evt: connected.set())
+            connection.open(True)
+            connected.wait(self.WARMUP_CONNECT_TIMEOUT)
             
-            result = synthesizer.speak_text_async(text).get()
+            # Keep the connection object alive for as long as the synthesizer
+            self._warm_connection = connection
+            self._release_synthesizer(synthesizer)
+        except Exception:
+            pass  # Warm-up is best effort; requests connect on their own
+    
+    @classmethod
+    def derive_prefix(cls, voice):
+        """Return the default output filename prefix for a voice argument."""
+        prefix = cls._PREFIX_CACHE.get(voice)
+        if prefix is None:
+            prefix = cls._PREFIX_CACHE.setdefault(voice, cls._compute_prefix(voice))
+        return prefix
+    
+    @classmethod
+    def _compute_prefix(cls, voice):
+        """Derive a filename prefix from a voice shortcut or full Azure voice name."""
+        # Check if the voice is a shortcut name
+        voice_shortcut = voice.lower()
+        if voice_shortcut in cls.POPULAR_VOICES:
+            return voice_shortcut
+        
+        # For full voice names, extract a meaningful prefix
+        if 'en-US-' in voice:
+            # Extract voice name from full Azure voice name
+            voice_part = voice.replace('en-US-', '').replace('Neural', '').replace('Multilingual', '')
+            return voice_part.lower()
+        
+        return 'tts'  # Keep default for unknown formats
+    
+    def _cache_path(self, text):
+        """Return the cache file for a (voice, text, format) combination."""
+        key = f"{self.voice_name}|{self.output_format}|{text}".encode('utf-8')
+        return self.cache_dir / f"{hashlib.blake2b(key, digest_size=16).hexdigest()}.{self.output_format}"
+    
+    def _evict_cache(self):
+        """Delete least recently used cache entries until the cache fits its size cap.
+        
+        Scans the whole cache, so it only runs on the first miss and whenever
+        the running total goes over the cap.
+        """
+        entries = []
+        stale = time.time() - self.STALE_TEMP_SECONDS
+        for path in self.cache_dir.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == '.tmp':
+                # Leave in-progress temp files alone, but clear out abandoned ones
+                if stat.st_mtime < stale:
+                    _remove(path)
+                continue
+            if path.suffix[1:] in self.OUTPUT_FORMATS:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        if total > self.cache_max_bytes:
+            limit = self.cache_max_bytes * self.CACHE_EVICT_FRACTION
+            for _, size, path in sorted(entries):
+                if total <= limit:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+        self._cache_bytes = total
+    
+    def _add_to_cache_size(self, size):
+        """Count a new cache entry, evicting old ones once the cap is exceeded."""
+        with self._cache_lock:
+            if self._cache_bytes is not None:
+                self._cache_bytes += size
+                if self._cache_bytes <= self.cache_max_bytes:
+                    return
+            self._evict_cache()
+    
+    def is_cached(self, text):
+        """Return True if audio for text is already in the cache."""
+        return self.cache_dir is not None and self._cache_path(text).exists()
+    
+    def _prepare_output(self, text, output_file):
+        """Clear output_file and decide where fresh audio for text should go.
+        
+        Returns (output_file, cached, target); target is None on a cache hit.
+        """
+        output_file = Path(output_file)
+        if output_file.exists():
+            # Never write through a hard link into the cache
+            output_file.unlink()
+        elif not output_file.parent.is_dir():
+            # Fail before paying for a synthesis that has nowhere to go
+            raise AzureTTSError(f"Output directory does not exist: {output_file.parent}")
+        
+        if self.cache_dir is None:
+            return output_file, None, output_file
+        
+        cached = self._cache_path(text)
+        if cached.exists():
+            os.utime(cached)  # Mark entry as recently used
+            return output_file, cached, None
+        
+        fd, tmp_name = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        os.close(fd)
+        return output_file, cached, tmp_name
+    
+    def _commit_output(self, output_file, cached, target):
+        """Move freshly written audio into the cache and link it to output_file.
+        
+        Only call this once the audio at target is completely written, or a
+        crash could leave a truncated entry in the cache.
+        """
+        if cached is None:
+            return
+        
+        size = None
+        if target is not None:
+            os.chmod(target, 0o644)
+            size = os.stat(target).st_size
+            os.replace(target, cached)
+        
+        # Hard link the entry into place, copying across filesystems
+        try:
+            os.link(cached, output_file)
+        except FileNotFoundError:
+            if not cached.exists():
+                raise AzureTTSError(f"Cache entry disappeared while linking: {cached}")
+            raise
+        except OSError:
+            shutil.copyfile(cached, output_file)
+        
+        if size is not None:
+            self._add_to_cache_size(size)
+    
+    def _discard_output(self, cached, target):
+        """Remove the temporary cache file left by a failed synthesis."""
+        if cached is not None and target is not None and os.path.exists(target):
+            os.unlink(target)
+    
+    def _store_output(self, text, output_file, read_audio):
+        """Place audio for text at output_file, going through the cache.
+        
+        read_audio() is only called on a cache miss and must return the
+        synthesized audio bytes, or None if there are none.
+        """
+        output_file, cached, target = self._prepare_output(text, output_file)
+        if target is None:
+            self._commit_output(output_file, cached, target)
+            return True
+        
+        try:
+            data = read_audio()
+        except BaseException:
+            self._discard_output(cached, target)
+            raise
+        return self._write_output(data, output_file, cached, target)
+    
+    def _write_output(self, data, output_file, cached, target, on_saved=None):
+        """Write audio to target and commit it to output_file once it is on disk."""
+        if data is None:
+            self._discard_output(cached, target)
+            return False
+        self._dump(data, target, lambda: self._publish_output(output_file, cached, target, on_saved))
+        return True
+    
+    def _publish_output(self, output_file, cached, target, on_saved=None):
+        """Commit output_file, then call on_saved() now that it exists."""
+        self._commit_output(output_file, cached, target)
+        if on_saved is not None:
+            on_saved()
+    
+    def begin(self, text, output_file):
+        """Start synthesizing text to audio file without waiting for the result.
+        
+        Returns a PendingSynthesis to pass to finish(). Many requests can be
+        in flight at once since the SDK performs the network I/O on its own
+        background threads.
+        """
+        output_file, cached, target = self._prepare_output(text, output_file)
+        if target is None:
+            return PendingSynthesis(output_file, cached, None, None, None)
+        
+        try:
+            synthesizer = self._acquire_synthesizer()
+            future = synthesizer.speak_text_async(text)
+        except Exception as e:
+            self._discard_output(cached, target)
+            raise AzureTTSError(f"Synthesis failed: {str(e)}")
+        
+        return PendingSynthesis(output_file, cached, target, synthesizer, future)
+    
+    def finish(self, pending, on_saved=None):
+        """Wait for a synthesis started by begin() and put its audio in place.
+        
+        With write buffering or io_uring the file may only appear later;
+        on_saved() is called once it actually exists.
+        """
+        if pending.future is None:
+            self._publish_output(pending.output_file, pending.cached, pending.target, on_saved)
+            return True
+        
+        try:
+            data = self._result_audio(pending.future)
+        except BaseException:
+            self._discard_output(pending.cached, pending.target)
+            raise
+        finally:
+            self._release_synthesizer(pending.synthesizer)
+        return self._write_output(data, pending.output_file, pending.cached, pending.target, on_saved)
+    
+    def cancel(self, pending):
+        """Abandon a synthesis started by begin() and remove its temporary file.
+        
+        The synthesizer may still be busy with the request, so it is dropped
+        instead of going back to the idle pool.
+        """
+        self._discard_output(pending.cached, pending.target)
+    
+    def synthesize_to_file(self, text, output_file):
+        """Synthesize text to audio file, reusing cached audio when available."""
+        result = self.finish(self.begin(text, output_file))
+        self.flush_writes()
+        return result
+    
+    def _ssml(self, text):
+        """Wrap text in SSML for the configured voice."""
+        # Voice names start with their locale, e.g. en-US-AvaNeural or sr-Latn-RS-NicholasNeural
+        match = re.match(r'([a-z]{2,3}(?:-[A-Z][a-z]{3})?-[A-Z]{2})-', self.voice_name)
+        language = match.group(1) if match else 'en-US'
+        return (
+            f"<speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' xml:lang='{html.escape(language)}'>"
+            f"<voice name='{html.escape(self.voice_name)}'>{html.escape(text)}</voice>"
+            "</speak>"
+        )
+    
+    async def synthesize_to_file_http(self, session, text, output_file, on_saved=None):
+        """Synthesize text to audio file with a direct REST call, bypassing the SDK.
+        
+        session is a shared aiohttp.ClientSession, so one process can keep
+        many lightweight requests in flight over a single connection pool.
+        on_saved() is called once the file exists, as with finish().
+        """
+        aiohttp = _aiohttp()
+        output_file, cached, target = self._prepare_output(text, output_file)
+        if target is None:
+            self._publish_output(output_file, cached, target, on_saved)
+            return True
+        
+        url = f"https://{self.region}.tts.speech.microsoft.com/cognitiveservices/v1"
+        headers = {
+            'Ocp-Apim-Subscription-Key': self.speech_key,
+            'Content-Type': 'application/ssml+xml',
+            'X-Microsoft-OutputFormat': self.OUTPUT_FORMATS[self.output_format][1],
+            'User-Agent': 'azure-tts-cli'
+        }
+        try:
+            async with session.post(url, data=self._ssml(text).encode('utf-8'), headers=headers) as response:
+                if response.status != 200:
+                    detail = await response.text()
+                    raise AzureTTSError(
+                        f"Synthesis failed: HTTP {response.status} {response.reason}"
+                        + (f"\nError details: {detail}" if detail else "")
+                    )
+                data = await response.read()
+        except aiohttp.ClientError as e:
+            self._discard_output(cached, target)
+            raise AzureTTSError(f"Synthesis failed: {str(e)}")
+        except BaseException:
+            self._discard_output(cached, target)
+            raise
+        return self._write_output(data, output_file, cached, target, on_saved)
+    
+    def synthesize_batch(self, texts, output_files):
+        """Synthesize many texts in a single Azure batch synthesis job.
+        
+        Texts already in the cache are skipped; the rest are submitted as one
+        job whose ZIP result is unpacked to the matching output files.
+        """
+        jobs = list(zip(texts, output_files))
+        pending = [text for text, _ in jobs if not self.is_cached(text)]
+        
+        members = {}
+        if pending:
+            archive = self._run_batch_job(pending)
+            # Audio files are numbered in input order next to JSON reports
+            names = sorted(name for name in archive.namelist() if not name.endswith('.json'))
+            if len(names) != len(pending):
+                raise AzureTTSError(
+                    f"Batch synthesis returned {len(names)} files for {len(pending)} inputs"
+                )
+            members = dict(zip(pending, names))
+        
+        for text, output_file in jobs:
+            if text in members:
+                read_audio = lambda name=members[text]: archive.read(name)
+            else:
+                # Cached before submission; re-synthesize if it was evicted since
+                read_audio = lambda text=text: self._synthesize(text)
+            self._store_output(text, output_file, read_audio)
+        self.flush_writes()
+        return True
+    
+    def _run_batch_job(self, texts):
+        """Submit a batch synthesis job, wait for it and return the result archive."""
+        import uuid
+        import requests
+        
+        url = (
+            f"https://{self.region}.api.cognitive.microsoft.com/texttospeech/"
+            f"batchsyntheses/{uuid.uuid4()}?api-version={self.BATCH_API_VERSION}"
+        )
+        headers = {'Ocp-Apim-Subscription-Key': self.speech_key}
+        body = {
+            "inputKind": "PlainText",
+            "inputs": [{"content": text} for text in texts],
+            "properties": {
+                "outputFormat": self.OUTPUT_FORMATS[self.output_format][1],
+                "concatenateResult": False
+            },
+            "synthesisConfig": {"voice": self.voice_name}
+        }
+        
+        try:
+            response = requests.put(url, json=body, headers=headers, timeout=30)
+            response.raise_for_status()
             
-            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                return True
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                cancellation_details = result.cancellation_details
-                error_msg = f"Speech synthesis canceled: {cancellation_details.reason}"
-                if cancellation_details.error_details:
-                    error_msg += f"\nError details: {cancellation_details.error_details}"
-                raise AzureTTSError(error_msg)
+            deadline = time.monotonic() + self.BATCH_TIMEOUT
+            while True:
+                job = requests.get(url, headers=headers, timeout=30)
+                job.raise_for_status()
+                job = job.json()
+                status = job.get('status')
+                if status == 'Succeeded':
+                    break
+                if status == 'Failed':
+                    error = job.get('properties', {}).get('error', {})
+                    raise AzureTTSError(
+                        f"Batch synthesis failed: {error.get('message', 'unknown error')}"
+                    )
+                if time.monotonic() > deadline:
+                    raise AzureTTSError(f"Batch synthesis timed out after {self.BATCH_TIMEOUT}s")
+                time.sleep(self.BATCH_POLL_INTERVAL)
             
+            result = requests.get(job['outputs']['result'], timeout=300)
+            result.raise_for_status()
+        except requests.RequestException as e:
+            raise AzureTTSError(f"Batch synthesis request failed: {str(e)}")
+        
+        try:
+            requests.delete(url, headers=headers, timeout=30)
+        except requests.RequestException:
+            pass  # The service removes finished jobs on its own eventually
+        
+        return zipfile.ZipFile(io.BytesIO(result.content))
+    
+    def _check_result(self, result):
+        """Return True for a completed synthesis result, raise if it was canceled."""
+        if result.reason == self._sdk.ResultReason.SynthesizingAudioCompleted:
+            return True
+        elif result.reason == self._sdk.ResultReason.Canceled:
+            cancellation_details = result.cancellation_details
+            error_msg = f"Speech synthesis canceled: {cancellation_details.reason}"
+            if cancellation_details.error_details:
+                error_msg += f"\nError details: {cancellation_details.error_details}"
+            raise AzureTTSError(f"Synthesis failed: {error_msg}")
+        
+        return False
+    
+    def _acquire_synthesizer(self):
+        """Take an idle in-memory synthesizer, creating one if none is free.
+        
+        A synthesizer handles its requests one at a time, so each request in
+        flight gets its own; returning them afterwards keeps the connections
+        warm for the next line.
+        """
+        with self._synthesizer_lock:
+            if self._idle_synthesizers:
+                return self._idle_synthesizers.pop()
+        # No audio config: the audio is only returned in the result
+        return self._sdk.SpeechSynthesizer(speech_config=self.speech_config, audio_config=None)
+    
+    def _release_synthesizer(self, synthesizer):
+        """Return a synthesizer to the idle pool."""
+        with self._synthesizer_lock:
+            self._idle_synthesizers.append(synthesizer)
+    
+    def _result_audio(self, future):
+        """Wait for a synthesis future and return its audio, or None if there is none."""
+        try:
+            result = future.get()
         except Exception as e:
             raise AzureTTSError(f"Synthesis failed: {str(e)}")
         
-        return False
+        if self._check_result(result):
+            return result.audio_data
+        return None
+    
+    def _get_ring(self):
+        """Return the io_uring instance used for writes, or None if unavailable.
+        
+        The ring is only created on the first write, so runs that never
+        write a file skip loading liburing. Caller holds _ring_lock.
+        """
+        if not self._ring_ready:
+            self._ring_ready = True
+            self._ring = self._init_ring()
+            if self._ring is not None:
+                self._ring_cqe = _liburing().Cqe()
+        return self._ring
+    
+    def _init_ring(self):
+        """Create the io_uring instance used for writes, or None if unavailable."""
+        liburing = _liburing()
+        if liburing is None or not sys.platform.startswith('linux'):
+            return None
+        ring = liburing.Ring()
+        try:
+            liburing.io_uring_queue_init(self.URING_QUEUE_DEPTH, ring)
+        except OSError:  # Kernel too old or io_uring disabled
+            return None
+        return ring
+    
+    def buffer_writes(self, limit_bytes=None):
+        """Hold written audio in memory until limit_bytes have accumulated.
+        
+        The data is written in bursts, and output files only appear, and
+        cache entries only get published, once their audio is on disk.
+        The default limit is half the last-level CPU cache. Call
+        flush_writes() to write out whatever is still buffered.
+        """
+        if limit_bytes is None:
+            limit_bytes = _last_level_cache_size() // 2
+        self._write_buffer_limit = limit_bytes
+    
+    def _dump(self, data, output_file, on_written=None):
+        """Write audio bytes to output_file in block-sized chunks.
+        
+        on_written() is called once the data is completely written; a failed
+        write removes output_file instead. With write buffering or io_uring
+        this may happen after return; call flush_writes() to wait for it.
+        """
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+        fd = os.open(str(output_file), flags, 0o644)
+        if self._write_buffer_limit:
+            with self._write_buffer_lock:
+                self._write_buffer.append((fd, data, output_file, on_written))
+                self._write_buffer_bytes += len(data)
+                full = (self._write_buffer_bytes >= self._write_buffer_limit
+                        or len(self._write_buffer) >= self.MAX_BUFFERED_FILES)
+            if full:
+                self._drain_write_buffer()
+            return
+        self._write_fd(fd, data, output_file, on_written)
+    
+    def _drain_write_buffer(self):
+        """Write out every file held in the write buffer."""
+        while True:
+            with self._write_buffer_lock:
+                if not self._write_buffer:
+                    self._write_buffer_bytes = 0
+                    return
+                fd, data, output_file, on_written = self._write_buffer.popleft()
+                self._write_buffer_bytes -= len(data)
+            self._write_fd(fd, data, output_file, on_written)
+    
+    def _write_fd(self, fd, data, output_file, on_written=None):
+        """Write data to an open file descriptor, close it and call on_written()."""
+        with self._ring_lock:
+            if self._get_ring() is not None:
+                if len(self._ring_writes) >= self.URING_QUEUE_DEPTH:
+                    self._reap_write()
+                self._submit_write(fd, bytes(data), 0, output_file, on_written)
+                return
+        try:
+            view = memoryview(data)
+            written = 0
+            while written < len(view):
+                written += os.write(fd, view[written:written + self._write_block_size])
+        except BaseException:
+            os.close(fd)
+            _remove(output_file)
+            raise
+        os.close(fd)
+        if on_written is not None:
+            on_written()
+    
+    def _submit_write(self, fd, data, offset, output_file, on_written):
+        """Queue a write of data at offset on the ring. Caller holds _ring_lock."""
+        liburing = _liburing()
+        sqe = liburing.io_uring_get_sqe(self._ring)
+        liburing.io_uring_prep_write(sqe, fd, data, offset)
+        self._ring_next_id += 1
+        liburing.io_uring_sqe_set_data64(sqe, self._ring_next_id)
+        # Keep the buffer alive until the kernel reports completion
+        self._ring_writes[self._ring_next_id] = (fd, data, offset, output_file, on_written)
+        liburing.io_uring_submit(self._ring)
+    
+    def _reap_write(self):
+        """Wait for one io_uring write to complete. Caller holds _ring_lock."""
+        liburing = _liburing()
+        liburing.io_uring_wait_cqe(self._ring, self._ring_cqe)
+        cqe = self._ring_cqe[0]
+        write_id = cqe.user_data
+        try:
+            res = cqe.res
+        except OSError as e:  # liburing raises for failed requests
+            res = -e.errno
+        liburing.io_uring_cqe_seen(self._ring, cqe)
+        
+        fd, data, offset, output_file, on_written = self._ring_writes.pop(write_id)
+        if res < 0:
+            # Never leave a partial file behind where it could be mistaken for audio
+            os.close(fd)
+            _remove(output_file)
+            if self._ring_error is None:
+                self._ring_error = f"Error writing {output_file}: {os.strerror(-res)}"
+        elif res < len(data):
+            self._submit_write(fd, data[res:], offset + res, output_file, on_written)
+        else:
+            os.close(fd)
+            if on_written is not None:
+                try:
+                    on_written()
+                except Exception as e:
+                    if self._ring_error is None:
+                        self._ring_error = str(e)
+    
+    def flush_writes(self):
+        """Wait until every buffered or submitted write has reached its file."""
+        self._drain_write_buffer()
+        if self._ring is None:
+            return
+        with self._ring_lock:
+            while self._ring_writes:
+                self._reap_write()
+            error, self._ring_error = self._ring_error, None
+        if error:
+            raise AzureTTSError(error)
+    
+    def _synthesize(self, text):
+        """Synthesize text through the Azure service and return its audio."""
+        try:
+            synthesizer = self._acquire_synthesizer()
+            future = synthesizer.speak_text_async(text)
+        except Exception as e:
+            raise AzureTTSError(f"Synthesis failed: {str(e)}")
+        
+        try:
+            return self._result_audio(future)
+        finally:
+            self._release_synthesizer(synthesizer)
     
     def synthesize_to_speaker(self, text):
         """Synthesize text to default speaker."""
         try:
-            audio_config = speechsdk.audio.AudioOutputConfig(use_default_speaker=True)
-            synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=self.speech_config, 
-                audio_config=audio_config
-            )
-            
-            result = synthesizer.speak_text_async(text).get()
-            
-            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                return True
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                cancellation_details = result.cancellation_details
-                error_msg = f"Speech synthesis canceled: {cancellation_details.reason}"
-                if cancellation_details.error_details:
-                    error_msg += f"\nError details: {cancellation_details.error_details}"
-                raise AzureTTSError(error_msg)
+            if self._speaker_synthesizer is None:
+                audio_config = self._sdk.audio.AudioOutputConfig(use_default_speaker=True)
+                self._speaker_synthesizer = self._sdk.SpeechSynthesizer(
+                    speech_config=self.speech_config, 
+                    audio_config=audio_config
+                )
             
+            result = self._speaker_synthesizer.speak_text_async(text).get()
         except Exception as e:
             raise AzureTTSError(f"Synthesis failed: {str(e)}")
         
-        return False
+        return self._check_result(result)
 
 
-def read_text_file(file_path):
-    """Read text from file and return lines."""
+def _remove(path):
+    """Delete path if it exists."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = [line.strip() for line in f.readlines() if line.strip()]
-        return lines
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _last_level_cache_size():
+    """Return the size of the largest CPU cache in bytes, guessing 8 MiB if unknown."""
+    for name in ('SC_LEVEL3_CACHE_SIZE', 'SC_LEVEL2_CACHE_SIZE'):
+        try:
+            size = os.sysconf(name)
+        except (AttributeError, ValueError, OSError):
+            continue
+        if size > 0:
+            return size
+    return 8 * 1024 * 1024
+
+
+def sync_directory(path):
+    """Flush the filesystem holding path to disk with a single syncfs(2) call.
+    
+    Only available on Linux; elsewhere this does nothing.
+    """
+    if not sys.platform.startswith('linux'):
+        return
+    import ctypes
+    try:
+        syncfs = ctypes.CDLL(None, use_errno=True).syncfs
+    except (OSError, AttributeError):
+        return
+    
+    fd = os.open(str(path), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        if syncfs(fd) != 0:
+            errno = ctypes.get_errno()
+            raise AzureTTSError(f"Error syncing {path}: {os.strerror(errno)}")
+    finally:
+        os.close(fd)
+
+
+def iter_text_file(file_path):
+    """Yield the stripped, non-empty lines of a text file as it is read."""
+    try:
+        with open(file_path, 'r', encoding='utf-8', buffering=1 << 20) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
     except FileNotFoundError:
         raise AzureTTSError(f"Text file not found: {file_path}")
     except Exception as e:
         raise AzureTTSError(f"Error reading text file: {str(e)}")
 
 
-def create_output_filename(base_name, line_number, output_dir):
-    """Create output filename for audio file."""
-    output_dir = Path(output_dir)
-    output_dir.mkdir(exist_ok=True)
-    return output_dir / f"{base_name}_{line_number:03d}.wav"
+def read_text_file(file_path):
+    """Read text from file and return lines."""
+    return list(iter_text_file(file_path))
+
+
+def chain_lines(head, rest):
+    """Yield the lines in head, then the rest of a partially read line iterator.
+    
+    Unlike itertools.chain, closing this generator also closes rest, so
+    a file reader can be stopped through it.
+    """
+    yield from head
+    yield from rest
+
+
+def prefetch(iterable, maxsize):
+    """Yield items from iterable while a background thread reads ahead.
+    
+    At most maxsize items are held in between, so reading overlaps with
+    synthesis without pulling the whole input into memory. Errors raised
+    by the iterable are re-raised in the consumer. If the consumer stops
+    early, the reader closes the iterable and exits.
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    
+    def put(entry):
+        # Give up once the consumer has gone away
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def reader():
+        try:
+            for item in iterable:
+                if not put(('item', item)):
+                    # Let a generator release its file before the thread exits
+                    close = getattr(iterable, 'close', None)
+                    if close is not None:
+                        close()
+                    return
+        except BaseException as e:
+            put(('error', e))
+        else:
+            put(('done', None))
+    
+    threading.Thread(target=reader, daemon=True).start()
+    try:
+        while True:
+            kind, value = items.get()
+            if kind == 'done':
+                return
+            if kind == 'error':
+                raise value
+            yield value
+    finally:
+        stop.set()
+
+
+def create_output_filename(base_name, line_number, output_dir, extension='wav'):
+    """Create output filename for audio file inside an existing output_dir Path."""
+    return output_dir / f"{base_name}_{line_number:03d}.{extension}"
 
 
 def list_voices():
@@ -142,8 +947,270 @@ def list_voices():
     print("https://docs.microsoft.com/en-us/azure/cognitive-services/speech-service/language-support#neural-voices")
 
 
-def main():
-    """Main CLI function."""
+def dedupe_jobs(jobs, duplicates, window=DEDUPE_WINDOW):
+    """Yield (line_number, text, output_file) jobs whose text has not been seen yet.
+    
+    Repeats are recorded in duplicates as first_output_file -> [(line_number,
+    output_file), ...] so they can be filled in by link_duplicates() once
+    the first occurrence has been synthesized. Only the last window distinct
+    lines are remembered, so memory stays bounded on long files; a repeat
+    of an older line becomes a job of its own, which the cache usually
+    serves. duplicates still grows with the number of repeats.
+    """
+    first_outputs = OrderedDict()
+    for job in jobs:
+        i, line, output_file = job
+        first_output = first_outputs.get(line)
+        if first_output is None:
+            first_outputs[line] = output_file
+            if len(first_outputs) > window:
+                first_outputs.popitem(last=False)
+            yield job
+        else:
+            first_outputs.move_to_end(line)
+            duplicates.setdefault(first_output, []).append((i, output_file))
+
+
+def link_duplicates(duplicates):
+    """Point every repeated line's output at the audio of its first occurrence.
+    
+    Returns the number of files created.
+    """
+    count = 0
+    for source, copies in duplicates.items():
+        for i, output_file in copies:
+            if output_file.exists():
+                output_file.unlink()
+            try:
+                os.link(source, output_file)
+            except OSError:
+                shutil.copyfile(source, output_file)
+            print(f"✓ Saved line {i} to: {output_file} (same text as {source.name})")
+            count += 1
+    return count
+
+
+def synthesize_pipelined(tts, jobs, max_inflight, verbose=False):
+    """Synthesize (line_number, text, output_file) jobs with up to max_inflight requests open.
+    
+    Returns the number of jobs processed.
+    """
+    inflight = deque()
+    line_count = 0
+    
+    def finish_oldest():
+        i, output_file, pending = inflight.popleft()
+        # Report the line once its file exists, which may be after a later flush
+        tts.finish(pending, lambda: print(f"✓ Saved line {i} to: {output_file}"))
+    
+    try:
+        for i, line, output_file in jobs:
+            line_count += 1
+            if verbose:
+                print(f"Synthesizing line {i} to: {output_file}")
+            
+            inflight.append((i, output_file, tts.begin(line, output_file)))
+            if len(inflight) >= max_inflight:
+                finish_oldest()
+        
+        while inflight:
+            finish_oldest()
+    except BaseException:
+        # Don't leave temp files behind for requests that will never finish
+        for _, _, pending in inflight:
+            tts.cancel(pending)
+        raise
+    finally:
+        tts.flush_writes()
+    
+    return line_count
+
+
+def synthesize_over_http(tts, jobs, max_inflight, verbose=False):
+    """Synthesize (line_number, text, output_file) jobs as concurrent REST calls.
+    
+    Runs an asyncio loop with one aiohttp session and up to max_inflight
+    requests open. Returns the number of jobs processed.
+    """
+    import asyncio
+    aiohttp = _aiohttp()
+    
+    async def synthesize_one(session, i, line, output_file):
+        await tts.synthesize_to_file_http(
+            session, line, output_file, lambda: print(f"✓ Saved line {i} to: {output_file}")
+        )
+    
+    async def run():
+        line_count = 0
+        pending = set()
+        connector = aiohttp.TCPConnector(limit=max_inflight)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            try:
+                for i, line, output_file in jobs:
+                    line_count += 1
+                    if verbose:
+                        print(f"Synthesizing line {i} to: {output_file}")
+                    
+                    pending.add(asyncio.ensure_future(synthesize_one(session, i, line, output_file)))
+                    if len(pending) >= max_inflight:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            task.result()
+                
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+            except BaseException:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                raise
+        return line_count
+    
+    try:
+        return asyncio.run(run())
+    finally:
+        tts.flush_writes()
+
+
+# AzureTTS instance owned by a worker process
+_worker_tts = None
+
+
+def _init_worker(voice, use_cache, output_format):
+    """Create the AzureTTS instance for a worker process."""
+    global _worker_tts
+    _worker_tts = AzureTTS(voice_name=voice, use_cache=use_cache, output_format=output_format)
+    _worker_tts.warm_up()
+
+
+def _synthesize_in_worker(job):
+    """Synthesize one (line_number, text, output_file) job in a worker process."""
+    i, line, output_file = job
+    _worker_tts.synthesize_to_file(line, output_file)
+    return job
+
+
+def synthesize_in_processes(jobs, workers, tts_args, verbose=False):
+    """Synthesize (line_number, text, output_file) jobs in a pool of worker processes.
+    
+    Each worker owns its own AzureTTS built from tts_args, so nothing is
+    shared with this interpreter. Workers are spawned rather than forked
+    since the SDK's native threads do not survive a fork. Returns the
+    number of jobs processed.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    
+    inflight = deque()
+    line_count = 0
+    
+    def finish_oldest():
+        i, _, output_file = inflight.popleft().result()
+        print(f"✓ Saved line {i} to: {output_file}")
+    
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=tts_args
+    )
+    with executor:
+        try:
+            for job in jobs:
+                line_count += 1
+                if verbose:
+                    print(f"Synthesizing line {job[0]} to: {job[2]}")
+                
+                inflight.append(executor.submit(_synthesize_in_worker, job))
+                if len(inflight) >= 2 * workers:
+                    finish_oldest()
+            
+            while inflight:
+                finish_oldest()
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+    
+    return line_count
+
+
+# Defaults shared by the argparse parser and the fast-path parser
+ARG_DEFAULTS = {
+    'voice': 'ava',
+    'output_dir': './output',
+    'prefix': 'tts',
+    'jobs': 8,
+    'format': None,
+    'mode': 'auto',
+}
+
+# Ways to run file-mode synthesis; auto picks based on file length
+SYNTHESIS_MODES = ['auto', 'thread', 'process', 'http']
+
+# Options understood by the fast-path parser
+FAST_VALUE_OPTIONS = {
+    '-t': 'text', '--text': 'text',
+    '-f': 'file', '--file': 'file',
+    '-v': 'voice', '--voice': 'voice',
+    '-o': 'output', '--output': 'output',
+    '-d': 'output_dir', '--output-dir': 'output_dir',
+    '--prefix': 'prefix',
+    '-j': 'jobs', '--jobs': 'jobs', '--workers': 'jobs',
+    '--mode': 'mode',
+    '--format': 'format',
+}
+FAST_FLAG_OPTIONS = {
+    '--play': 'play',
+    '--batch': 'batch',
+    '--no-cache': 'no_cache',
+    '--sync': 'sync',
+    '--verbose': 'verbose',
+}
+
+
+def parse_fast_args(argv):
+    """Parse the common synthesis flags without building an argparse parser.
+    
+    Returns None for anything unusual (help, --list-voices, unknown or
+    malformed options) so the caller can fall back to argparse, which also
+    produces the proper error messages.
+    """
+    args = SimpleNamespace(
+        text=None, file=None, list_voices=False, output=None,
+        play=False, batch=False, no_cache=False, sync=False, verbose=False,
+        **ARG_DEFAULTS
+    )
+    
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in FAST_FLAG_OPTIONS:
+            setattr(args, FAST_FLAG_OPTIONS[arg], True)
+            i += 1
+        elif arg in FAST_VALUE_OPTIONS and i + 1 < len(argv) and not argv[i + 1].startswith('-'):
+            setattr(args, FAST_VALUE_OPTIONS[arg], argv[i + 1])
+            i += 2
+        else:
+            return None
+    
+    # -t and -f are mutually exclusive and one of them is required
+    if (args.text is None) == (args.file is None):
+        return None
+    if args.format is not None and args.format not in AzureTTS.OUTPUT_FORMATS:
+        return None
+    if args.mode not in SYNTHESIS_MODES:
+        return None
+    try:
+        args.jobs = int(args.jobs)
+    except ValueError:
+        return None
+    return args
+
+
+def build_parser():
+    """Build the full argparse parser for the CLI."""
     parser = argparse.ArgumentParser(
         description="Azure Text-to-Speech CLI Tool",
         epilog="Examples:\n"
@@ -172,7 +1239,7 @@ def main():
     # Voice selection
     parser.add_argument(
         '-v', '--voice',
-        default='ava',
+        default=ARG_DEFAULTS['voice'],
         help='Voice name (use popular name like "ava" or full Azure voice name). Default: ava'
     )
     
@@ -183,14 +1250,37 @@ def main():
     )
     parser.add_argument(
         '-d', '--output-dir',
-        default='./output',
+        default=ARG_DEFAULTS['output_dir'],
         help='Output directory for multiple files. Default: ./output'
     )
     parser.add_argument(
         '--prefix',
-        default='tts',
+        default=ARG_DEFAULTS['prefix'],
         help='Filename prefix for multiple files. Default: voice name (e.g., ava, emma)'
     )
+    parser.add_argument(
+        '--format',
+        choices=list(AzureTTS.OUTPUT_FORMATS),
+        default=ARG_DEFAULTS['format'],
+        help='Audio format to produce. Default: taken from the -o extension, otherwise wav'
+    )
+    parser.add_argument(
+        '-j', '--jobs', '--workers',
+        dest='jobs',
+        type=int,
+        default=ARG_DEFAULTS['jobs'],
+        help='Requests in flight (thread mode) or worker processes (process mode) '
+             'in file mode. Default: 8'
+    )
+    parser.add_argument(
+        '--mode',
+        choices=SYNTHESIS_MODES,
+        default=ARG_DEFAULTS['mode'],
+        help='How to run file-mode synthesis: pipelined requests in this process (thread), '
+             'a pool of worker processes (process), concurrent REST calls without the SDK '
+             f'(http, needs aiohttp), or process for files of {PROCESS_MIN_LINES}+ lines (auto). '
+             'Default: auto'
+    )
     
     # Other options
     parser.add_argument(
@@ -198,13 +1288,36 @@ def main():
         action='store_true',
         help='Play audio through default speaker instead of saving to file'
     )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Submit file-mode lines as one Azure batch synthesis job'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always call Azure instead of reusing previously synthesized audio'
+    )
+    parser.add_argument(
+        '--sync',
+        action='store_true',
+        help='Flush the output filesystem to disk (syncfs, Linux only) before exiting in file mode'
+    )
     parser.add_argument(
         '--verbose',
         action='store_true',
         help='Enable verbose output'
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    """Main CLI function."""
+    # Most invocations only use the common flags; skip argparse for those
+    args = parse_fast_args(sys.argv[1:])
+    if args is None:
+        args = build_parser().parse_args()
     
     # Handle list voices
     if args.list_voices:
@@ -216,22 +1329,20 @@ def main():
         if args.verbose:
             print(f"Initializing Azure TTS with voice: {args.voice}")
         
-        tts = AzureTTS(voice_name=args.voice)
+        # Infer the output format from the -o extension unless given explicitly
+        if args.format is None:
+            extension = Path(args.output).suffix[1:].lower() if args.output else ''
+            args.format = extension if extension in AzureTTS.OUTPUT_FORMATS else 'wav'
+        
+        tts = AzureTTS(
+            voice_name=args.voice,
+            use_cache=not args.no_cache,
+            output_format=args.format
+        )
         
         # Set prefix to voice shortcut if not explicitly provided
         if args.prefix == 'tts':  # Default prefix value
-            # Check if the voice is a shortcut name
-            voice_shortcut = args.voice.lower()
-            if voice_shortcut in AzureTTS.POPULAR_VOICES:
-                args.prefix = voice_shortcut
-            else:
-                # For full voice names, extract a meaningful prefix
-                if 'en-US-' in args.voice:
-                    # Extract voice name from full Azure voice name
-                    voice_part = args.voice.replace('en-US-', '').replace('Neural', '').replace('Multilingual', '')
-                    args.prefix = voice_part.lower()
-                else:
-                    args.prefix = 'tts'  # Keep default for unknown formats
+            args.prefix = AzureTTS.derive_prefix(args.voice)
         
         if args.verbose:
             print(f"Using Azure voice: {tts.voice_name}")
@@ -244,7 +1355,7 @@ def main():
                 tts.synthesize_to_speaker(args.text)
                 print("✓ Audio played successfully")
             else:
-                output_file = args.output or 'output.wav'
+                output_file = args.output or f"output.{args.format}"
                 if args.verbose:
                     print(f"Synthesizing to file: {output_file}")
                 tts.synthesize_to_file(args.text, output_file)
@@ -252,13 +1363,24 @@ def main():
         
         # Handle file input
         elif args.file:
-            lines = read_text_file(args.file)
+            # Stream the file; only look ahead far enough to pick a mode
+            lines = iter_text_file(args.file)
+            head = list(islice(lines, max(BATCH_MIN_LINES + 1, PROCESS_MIN_LINES)))
             
-            if not lines:
+            if not head:
                 print("No text found in file")
                 return 1
             
-            print(f"Processing {len(lines)} lines from {args.file}")
+            use_batch = args.batch and len(head) > BATCH_MIN_LINES and not args.play
+            mode = args.mode
+            if mode == 'auto':
+                mode = 'process' if len(head) >= PROCESS_MIN_LINES else 'thread'
+            if use_batch:
+                lines = head + list(lines)
+                print(f"Processing {len(lines)} lines from {args.file}")
+            else:
+                lines = chain_lines(head, lines)
+                print(f"Processing lines from {args.file}")
             
             if args.play:
                 # Play each line
@@ -267,18 +1389,55 @@ def main():
                         print(f"Playing line {i}: {line[:50]}...")
                     tts.synthesize_to_speaker(line)
                     print(f"✓ Played line {i}")
+                return 0
+            
+            # Only pipelined synthesis in this process uses SDK connections
+            if not use_batch and mode == 'thread':
+                tts.warm_up()
+            
+            # Create the output directory once for the whole file
+            output_dir = Path(args.output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            
+            # Write finished clips in bursts rather than one at a time
+            tts.buffer_writes()
+            
+            # Keep reading the file on a background thread while lines are synthesized
+            if not use_batch:
+                lines = prefetch(lines, 2 * max(1, args.jobs))
+            
+            # Synthesize each distinct line once; repeats are linked afterwards
+            duplicates = {}
+            jobs = dedupe_jobs((
+                (i, line, create_output_filename(args.prefix, i, output_dir, args.format))
+                for i, line in enumerate(lines, 1)
+            ), duplicates)
+            
+            if use_batch:
+                # Submit every line in one batch synthesis job
+                jobs = list(jobs)
+                if args.verbose:
+                    print(f"Submitting batch synthesis job for {len(jobs)} lines")
+                tts.synthesize_batch([line for _, line, _ in jobs], [path for _, _, path in jobs])
+                line_count = len(jobs)
             else:
-                # Save each line to separate file
-                for i, line in enumerate(lines, 1):
-                    output_file = create_output_filename(args.prefix, i, args.output_dir)
-                    
-                    if args.verbose:
-                        print(f"Synthesizing line {i} to: {output_file}")
-                    
-                    tts.synthesize_to_file(line, output_file)
-                    print(f"✓ Saved line {i} to: {output_file}")
+                if args.verbose:
+                    print(f"Synthesizing in {mode} mode")
                 
-                print(f"\n✓ All {len(lines)} audio files saved to: {args.output_dir}")
+                if mode == 'process':
+                    line_count = synthesize_in_processes(
+                        jobs, max(1, args.jobs), (args.voice, not args.no_cache, args.format), args.verbose
+                    )
+                elif mode == 'http':
+                    line_count = synthesize_over_http(tts, jobs, max(1, args.jobs), args.verbose)
+                else:
+                    line_count = synthesize_pipelined(tts, jobs, max(1, args.jobs), args.verbose)
+            
+            line_count += link_duplicates(duplicates)
+            if args.sync:
+                # Costs a flush of everything dirty on that filesystem, not just our files
+                sync_directory(output_dir)
+            print(f"\n✓ All {line_count} audio files saved to: {args.output_dir}")
     
     except AzureTTSError as e:
         print(f"Error: {e}", file=sys.stderr)